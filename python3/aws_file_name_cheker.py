@@ -1,30 +1,95 @@
 #!/usr/bin/env python3
 
+import os
 import sys
 import argparse
-from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
+
+# Walk a directory tree with os.scandir, yielding file entries without following
+# symlinked directories. DirEntry caches the file type, so no extra stat() per entry.
+# Subdirectories that cannot be read are skipped, as Path.glob() does; only a
+# failure on the root itself is raised.
+def _scandir_recursive(root: str, recursive: bool = True):
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                if recursive:
+                    try:
+                        yield from _scandir_recursive(entry.path)
+                    except OSError:
+                        continue
+            elif entry.is_file():
+                yield entry
+
+# Clean up a directory path the way Path() does for display: repeated separators,
+# '.' components and trailing separators are dropped. '..' is kept as given, since
+# resolving it lexically is wrong when the component before it is a symlink.
+def _clean_directory_path(path: str) -> str:
+    drive, rest = os.path.splitdrive(path)
+    if os.altsep:
+        rest = rest.replace(os.altsep, os.sep)
+    cleaned = os.sep.join(part for part in rest.split(os.sep) if part and part != os.curdir)
+    if rest.startswith(os.sep):
+        return drive + os.sep + cleaned
+    return drive + cleaned or os.curdir
 
 class S3FileNameValidator:
     # Validates file names against AWS S3 object key naming rules.
     
     # Characters that are safe to use in S3 object keys
-    SAFE_CHARS = set('0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ!-_.*\'()')
+    SAFE_CHARS = frozenset('0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ!-_.*\'()')
+    
+    # The same safe characters as bytes, used as a bytes.translate() deletion table
+    _SAFE_BYTES = ''.join(sorted(SAFE_CHARS)).encode('ascii')
     
     # Characters that require special handling (URL encoding recommended)
-    SPECIAL_HANDLING = set('&$@=;/:+,?')
+    SPECIAL_HANDLING = frozenset('&$@=;/:+,?')
     
     # Characters to avoid (may cause issues with various tools/protocols)
-    AVOID_CHARS = set('\\{}^%`]"> [~<#|')
+    AVOID_CHARS = frozenset('\\{}^%`]"> [~<#|')
     
     # Non-printable ASCII characters (0-31 and 127)
-    NON_PRINTABLE = set(chr(i) for i in range(0, 32)) | {chr(127)}
+    NON_PRINTABLE = frozenset(chr(i) for i in range(0, 32)) | {chr(127)}
     
     # Extended ASCII characters (128-255)
-    EXTENDED_ASCII = set(chr(i) for i in range(128, 256))
+    EXTENDED_ASCII = frozenset(chr(i) for i in range(128, 256))
+    
+    # Every character that affects classification; anything else (e.g. U+0100 and
+    # above) is neither safe nor flagged, so it is left out of the cache key
+    _CLASSIFIED_CHARS = NON_PRINTABLE | AVOID_CHARS | SPECIAL_HANDLING | EXTENDED_ASCII
     
     def __init__(self):
         self.issues = []
+        # Classification results keyed by the set of non-safe characters in a name
+        self._classification_cache = {}
+    
+    def _classify_characters(self, flagged: frozenset) -> tuple:
+        # Classify a set of non-safe characters.
+        # 
+        # Returns:
+        #     Tuple of (is_valid, issues, recommendations)
+        non_printable_chars = flagged & self.NON_PRINTABLE
+        avoid_chars = flagged & self.AVOID_CHARS
+        special_chars = flagged & self.SPECIAL_HANDLING
+        problematic_chars = flagged & self.EXTENDED_ASCII  # Extended ASCII might cause issues
+        
+        issues = []
+        recommendations = []
+        
+        # Report issues
+        if non_printable_chars:
+            issues.append(f"Contains non-printable characters: {list(non_printable_chars)}")
+        
+        if avoid_chars:
+            issues.append(f"Contains characters that should be avoided: {list(avoid_chars)}")
+        
+        if special_chars:
+            recommendations.append(f"Contains characters that may need URL encoding: {list(special_chars)}")
+        
+        if problematic_chars:
+            recommendations.append(f"Contains extended ASCII characters that may cause issues: {list(problematic_chars)}")
+        
+        return not issues, tuple(issues), tuple(recommendations)
     
     def validate_filename(self, filename: str, filepath: Optional[str] = None) -> Dict[str, Any]:
         # Validate a filename against S3 object key rules.
@@ -43,65 +108,61 @@ class S3FileNameValidator:
             'recommendations': []
         }
         
-        # Check length (1024 bytes max)
-        filename_bytes = filename.encode('utf-8')
-        if len(filename_bytes) > 1024:
+        # Check length (1024 bytes max); ASCII names are one byte per character,
+        # so only non-ASCII names need to be encoded to measure them
+        is_ascii = filename.isascii()
+        if is_ascii:
+            byte_length = len(filename)
+        else:
+            byte_length = len(filename.encode('utf-8'))
+        if byte_length > 1024:
             result['is_valid'] = False
-            result['issues'].append(f"Filename too long: {len(filename_bytes)} bytes (max 1024)")
+            result['issues'].append(f"Filename too long: {byte_length} bytes (max 1024)")
         
-        # Check for empty filename
-        if not filename.strip():
+        # Check for empty filename (isspace() avoids building a stripped copy)
+        if not filename or filename.isspace():
             result['is_valid'] = False
             result['issues'].append("Empty filename")
 
             return result
         
-        # Analyze characters
-        problematic_chars = []
-        special_chars = []
-        avoid_chars = []
-        non_printable_chars = []
-        
-        for char in filename:
-            if char in self.NON_PRINTABLE:
-                non_printable_chars.append(char)
-                result['is_valid'] = False
-            elif char in self.AVOID_CHARS:
-                avoid_chars.append(char)
-                result['is_valid'] = False
-            elif char in self.SPECIAL_HANDLING:
-                special_chars.append(char)
-            elif char in self.EXTENDED_ASCII:
-                # Extended ASCII might cause issues
-                problematic_chars.append(char)
-        
-        # Report issues
-        if non_printable_chars:
-            unique_chars = list(set(non_printable_chars))
-            result['issues'].append(f"Contains non-printable characters: {unique_chars}")
-        
-        if avoid_chars:
-            unique_chars = list(set(avoid_chars))
-            result['issues'].append(f"Contains characters that should be avoided: {unique_chars}")
+        # Analyze characters: collect the distinct characters in one C-level pass and
+        # drop the safe ones. What is left is classified once per distinct set and the
+        # result reused, since names in a tree tend to share the same few characters.
+        if is_ascii:
+            # Delete every safe byte through a 256-entry table so only the flagged
+            # characters are hashed into the set
+            flagged = frozenset(filename.encode('ascii').translate(None, self._SAFE_BYTES).decode('ascii'))
+        else:
+            flagged = frozenset(filename) - self.SAFE_CHARS
         
-        if special_chars:
-            unique_chars = list(set(special_chars))
-            result['recommendations'].append(f"Contains characters that may need URL encoding: {unique_chars}")
+        # Only characters in a category matter, so they alone key the cache; every
+        # non-safe ASCII character is in one, so only non-ASCII names need narrowing
+        classified = flagged if is_ascii else flagged & self._CLASSIFIED_CHARS
         
-        if problematic_chars:
-            unique_chars = list(set(problematic_chars))
-            result['recommendations'].append(f"Contains extended ASCII characters that may cause issues: {unique_chars}")
+        # Names without any classified characters skip classification entirely
+        if classified:
+            classification = self._classification_cache.get(classified)
+            if classification is None:
+                classification = self._classify_characters(classified)
+                self._classification_cache[classified] = classification
+            
+            is_valid, issues, recommendations = classification
+            if not is_valid:
+                result['is_valid'] = False
+            result['issues'].extend(issues)
+            result['recommendations'].extend(recommendations)
         
         # Check for trailing periods (console limitation)
         if filename.endswith('.'):
             result['recommendations'].append("Filename ends with period - may be truncated in S3 console")
         
-        # Check for relative path elements
-        if '../' in filename or './' in filename:
+        # Check for relative path elements ('./' also covers '../')
+        if './' in filename:
             result['recommendations'].append("Contains relative path elements - ensure proper handling")
         
         # Check for spaces
-        if ' ' in filename:
+        if ' ' in flagged:
             result['recommendations'].append("Contains spaces - may need special handling in URLs")
         
         return result
@@ -117,84 +178,91 @@ class S3FileNameValidator:
         #     List of validation results
 
         results = []
-        path = Path(directory)
+        # Cleaned once per scan so reported paths match the old Path-based output
+        root = _clean_directory_path(os.fspath(directory))
         
-        if not path.exists():
+        if not os.path.exists(root):
             raise FileNotFoundError(f"Directory not found: {directory}")
         
-        if not path.is_dir():
+        if not os.path.isdir(root):
             raise NotADirectoryError(f"Path is not a directory: {directory}")
         
-        # Get all files
-        pattern = "**/*" if recursive else "*"
+        # Build S3-like keys by slicing the root prefix off each entry path
+        prefix_len = len(root) if root.endswith(os.sep) else len(root) + 1
+        # scandir('.') yields './name'; report those paths relative, as Path did
+        path_start = prefix_len if root == os.curdir else 0
         
-        for file_path in path.glob(pattern):
-            if file_path.is_file():
-                # Create relative path for S3-like key
-                relative_path = file_path.relative_to(path)
-                s3_key = str(relative_path).replace('\\', '/')  # Normalize path separators
-                
-                result = self.validate_filename(s3_key, str(file_path))
-                results.append(result)
+        for entry in _scandir_recursive(root, recursive):
+            s3_key = entry.path[prefix_len:].replace(os.sep, '/')  # Normalize path separators
+            
+            result = self.validate_filename(s3_key, entry.path[path_start:])
+            results.append(result)
         
         return results
     
     def generate_report(self, results: List[Dict], show_valid: bool = False) -> str:
         # Generate a formatted report of validation results.
-        report = []
-        
-        total_files = len(results)
-        valid_files = sum(1 for r in results if r['is_valid'] and not r['recommendations'])
-        invalid_files = sum(1 for r in results if not r['is_valid'])
-        files_with_warnings = sum(1 for r in results if r['is_valid'] and r['recommendations'])
-        
-        report.append("="*80)
-        report.append("AWS S3 FILENAME VALIDATION REPORT")
-        report.append("="*80)
-        report.append(f"Total files scanned: {total_files}")
-        report.append(f"Valid files: {valid_files}")
-        report.append(f"Invalid files: {invalid_files}")
-        report.append(f"Files with warnings: {files_with_warnings}")
-        report.append("")
+        return ''.join(self.generate_report_iter(results, show_valid))
+    
+    def generate_report_iter(self, results: List[Dict], show_valid: bool = False) -> Iterator[str]:
+        # Yield the formatted report line by line (each ending in a newline) so it
+        # can be streamed to a file or stdout without building it in memory.
+        
+        # Partition results in a single pass; each section then walks only its own files
+        invalid_results = []
+        warning_results = []
+        valid_results = []
+        
+        for result in results:
+            if not result['is_valid']:
+                invalid_results.append(result)
+            elif result['recommendations']:
+                warning_results.append(result)
+            else:
+                valid_results.append(result)
+        
+        yield "="*80 + "\n"
+        yield "AWS S3 FILENAME VALIDATION REPORT\n"
+        yield "="*80 + "\n"
+        yield f"Total files scanned: {len(results)}\n"
+        yield f"Valid files: {len(valid_results)}\n"
+        yield f"Invalid files: {len(invalid_results)}\n"
+        yield f"Files with warnings: {len(warning_results)}\n"
+        yield "\n"
         
         # Show invalid files
-        if invalid_files > 0:
-            report.append("INVALID FILES:")
-            report.append("-" * 40)
-            for result in results:
-                if not result['is_valid']:
-                    report.append(f"❌ {result['filename']}")
-                    if result['filepath']:
-                        report.append(f"   Path: {result['filepath']}")
-                    for issue in result['issues']:
-                        report.append(f"   Issue: {issue}")
-                    report.append("")
+        if invalid_results:
+            yield "INVALID FILES:\n"
+            yield "-" * 40 + "\n"
+            for result in invalid_results:
+                yield f"❌ {result['filename']}\n"
+                if result['filepath']:
+                    yield f"   Path: {result['filepath']}\n"
+                for issue in result['issues']:
+                    yield f"   Issue: {issue}\n"
+                yield "\n"
         
         # Show files with warnings
-        if files_with_warnings > 0:
-            report.append("FILES WITH WARNINGS:")
-            report.append("-" * 40)
-            for result in results:
-                if result['is_valid'] and result['recommendations']:
-                    report.append(f"⚠️  {result['filename']}")
-                    if result['filepath']:
-                        report.append(f"   Path: {result['filepath']}")
-                    for rec in result['recommendations']:
-                        report.append(f"   Warning: {rec}")
-                    report.append("")
+        if warning_results:
+            yield "FILES WITH WARNINGS:\n"
+            yield "-" * 40 + "\n"
+            for result in warning_results:
+                yield f"⚠️  {result['filename']}\n"
+                if result['filepath']:
+                    yield f"   Path: {result['filepath']}\n"
+                for rec in result['recommendations']:
+                    yield f"   Warning: {rec}\n"
+                yield "\n"
         
         # Show valid files if requested
-        if show_valid and valid_files > 0:
-            report.append("VALID FILES:")
-            report.append("-" * 40)
-            for result in results:
-                if result['is_valid'] and not result['recommendations']:
-                    report.append(f"✅ {result['filename']}")
-                    if result['filepath']:
-                        report.append(f"   Path: {result['filepath']}")
-            report.append("")
-        
-        return '\n'.join(report)
+        if show_valid and valid_results:
+            yield "VALID FILES:\n"
+            yield "-" * 40 + "\n"
+            for result in valid_results:
+                yield f"✅ {result['filename']}\n"
+                if result['filepath']:
+                    yield f"   Path: {result['filepath']}\n"
+            yield "\n"
 
 def main():
     parser = argparse.ArgumentParser(
@@ -206,6 +274,8 @@ Examples:
   python3 aws_file_name_checker.py /path/to/files --no-recursive
   python3 aws_file_name_checker.py /path/to/files --show-valid
   python3 aws_file_name_checker.py /path/to/files --output report.txt
+  python3 aws_file_name_checker.py /path/to/files --json
+  python3 aws_file_name_checker.py /path/to/files --json-pretty
         """
     )
     
@@ -216,7 +286,9 @@ Examples:
                        help='Show valid files in the report')
     parser.add_argument('--output', '-o', help='Output report to file')
     parser.add_argument('--json', action='store_true',
-                       help='Output results in JSON format')
+                       help='Output results as JSON, one object per line (NDJSON)')
+    parser.add_argument('--json-pretty', action='store_true',
+                       help='Output results as a single indented JSON array')
     
     args = parser.parse_args()
     
@@ -227,22 +299,28 @@ Examples:
         print(f"Scanning {'recursively' if recursive else 'non-recursively'}: {args.directory}")
         results = validator.scan_directory(args.directory, recursive)
         
-        if args.json:
+        if args.json_pretty:
+            import json
+            output = (json.dumps(results, indent=2, ensure_ascii=False), '\n')
+        elif args.json:
             import json
-            output = json.dumps(results, indent=2, ensure_ascii=False)
+            # Encode and write one result per line instead of one giant document
+            encode = json.JSONEncoder(ensure_ascii=False).encode
+            output = (encode(result) + '\n' for result in results)
         else:
-            output = validator.generate_report(results, args.show_valid)
+            output = validator.generate_report_iter(results, args.show_valid)
         
+        # Stream the output instead of joining it into one large string
         if args.output:
             with open(args.output, 'w', encoding='utf-8') as f:
-                f.write(output)
+                f.writelines(output)
             print(f"Report written to: {args.output}")
         else:
-            print(output)
+            sys.stdout.writelines(output)
             
-        # Exit with error code if there are invalid files
-        invalid_count = sum(1 for r in results if not r['is_valid'])
-        sys.exit(1 if invalid_count > 0 else 0)
+        # Exit with error code if there are invalid files (stops at the first one)
+        has_invalid = any(not r['is_valid'] for r in results)
+        sys.exit(1 if has_invalid else 0)
         
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
@@ -8,20 +8,37 @@
 # Usage:
 #     python delete_markers.py bucket-name
 #     python delete_markers.py bucket-name -p profile-name
+#     python delete_markers.py bucket-name --csv > delete_markers.csv
 #
 # Required modules:
 #     - boto3: AWS SDK for Python
 #     - argparse: Command-line argument parsing
+#     - csv: CSV output
 #     - sys: System-specific parameters and functions
 #     - botocore.exceptions: AWS SDK exception handling
 
 import boto3
 import argparse
+import csv
 import sys
 from botocore.exceptions import ClientError, NoCredentialsError
 
-# Lists all delete markers in the specified S3 bucket and displays them in a formatted table
-def list_delete_markers(bucket_name, profile_name=None):
+# Formats the delete markers of one list_object_versions page as
+# (key, version id, last modified, owner) rows
+def delete_marker_rows(page):
+    return [
+        (
+            marker['Key'],
+            marker['VersionId'],
+            marker['LastModified'].replace(tzinfo=None).isoformat(' ', 'seconds'),
+            marker.get('Owner', {}).get('DisplayName', 'Unknown')
+        )
+        for marker in page.get('DeleteMarkers', ())
+    ]
+
+# Lists all delete markers in the specified S3 bucket and displays them in a formatted table,
+# or streams them to stdout as CSV page by page
+def list_delete_markers(bucket_name, profile_name=None, csv_output=False):
     try:
         if profile_name:
             session = boto3.Session(profile_name=profile_name)
@@ -32,25 +49,27 @@ def list_delete_markers(bucket_name, profile_name=None):
         paginator = s3_client.get_paginator('list_object_versions')
         page_iterator = paginator.paginate(Bucket=bucket_name)
         
+        if csv_output:
+            writer = csv.writer(sys.stdout, lineterminator='\n')
+            writer.writerow(['Key', 'VersionId', 'LastModified', 'Owner'])
+            for page in page_iterator:
+                writer.writerows(delete_marker_rows(page))
+            return
+        
         delete_markers = []
         
         for page in page_iterator:
-            if 'DeleteMarkers' in page:
-                for marker in page['DeleteMarkers']:
-                    delete_markers.append({
-                        'Key': marker['Key'],
-                        'VersionId': marker['VersionId'],
-                        'LastModified': marker['LastModified'],
-                        'Owner': marker.get('Owner', {}).get('DisplayName', 'Unknown')
-                    })
+            delete_markers.extend(delete_marker_rows(page))
         
         if delete_markers:
             print(f"Found {len(delete_markers)} delete markers in bucket '{bucket_name}':\n")
             print(f"{'Key':<50} {'Version ID':<36} {'Last Modified':<20} {'Owner'}")
             print("-" * 120)
             
-            for marker in delete_markers:
-                print(f"{marker['Key']:<50} {marker['VersionId']:<36} {marker['LastModified'].strftime('%Y-%m-%d %H:%M:%S'):<20} {marker['Owner']}")
+            sys.stdout.writelines(
+                f"{key:<50} {version_id:<36} {last_modified:<20} {owner}\n"
+                for key, version_id, last_modified, owner in delete_markers
+            )
         else:
             print(f"No delete markers found in bucket '{bucket_name}'")
             
@@ -75,10 +94,12 @@ def main():
     parser = argparse.ArgumentParser(description='List all delete markers in an S3 bucket')
     parser.add_argument('bucket_name', help='Name of the S3 bucket to scan for delete markers')
     parser.add_argument('-p', '--profile', help='AWS credential profile to use')
+    parser.add_argument('--csv', action='store_true',
+                       help='Write delete markers to stdout as CSV instead of a table')
     
     args = parser.parse_args()
     
-    list_delete_markers(args.bucket_name, args.profile)
+    list_delete_markers(args.bucket_name, args.profile, args.csv)
 
 if __name__ == '__main__':
     main()
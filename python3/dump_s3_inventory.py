@@ -6,19 +6,97 @@ import boto3
 import csv
 import sys
 import argparse
+import queue
+import threading
 from datetime import datetime
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
 
+# Reuse pooled HTTPS connections and back off adaptively when S3 throttles
+S3_CLIENT_CONFIG = Config(max_pool_connections=10, retries={'mode': 'adaptive'})
 
-def dump_s3_inventory(bucket_name, output_file, profile_name=None, exclude_dir=None):
+# Sorts after any other character, so prefix + KEY_MAX_CHAR is past every key under prefix
+KEY_MAX_CHAR = '\U0010ffff'
+
+
+def split_key_ranges(base_prefix, exclude_prefixes):
+    # Split the keys under base_prefix into (start_after, end_before) ranges around
+    # the excluded prefixes, so excluded directories are never listed; None means
+    # unbounded. Only exclusions under base_prefix can be skipped this way.
+    excluded = sorted(p for p in set(exclude_prefixes) if p.startswith(base_prefix))
+    # Drop exclusions nested inside another excluded prefix
+    skipped = []
+    for prefix in excluded:
+        if not skipped or not prefix.startswith(skipped[-1]):
+            skipped.append(prefix)
+    
+    starts = [None] + [prefix + KEY_MAX_CHAR for prefix in skipped]
+    ends = skipped + [None]
+    return list(zip(starts, ends))
+
+
+def list_key_range(paginator, bucket_name, prefix, start_after, end_before, pagination_config):
+    # Yield pages of keys under prefix that sort after start_after and before end_before,
+    # stopping at the first page that reaches end_before
+    params = {'Bucket': bucket_name, 'Prefix': prefix, 'PaginationConfig': pagination_config}
+    if start_after is not None:
+        params['StartAfter'] = start_after
+    
+    for page in paginator.paginate(**params):
+        contents = page.get('Contents')
+        if end_before is not None and contents and contents[-1]['Key'] >= end_before:
+            page['Contents'] = [obj for obj in contents if obj['Key'] < end_before]
+            yield page
+            return
+        yield page
+
+
+def prefetch_pages(page_iterators, max_workers=1, maxsize=2):
+    # Fetch pages from one or more paginators on background threads so list
+    # requests stay in flight while pages are written; errors are re-raised in the caller
+    pending = queue.Queue()
+    for page_iterator in page_iterators:
+        pending.put(page_iterator)
+    
+    workers = min(max_workers, pending.qsize())
+    pages = queue.Queue(maxsize=maxsize * max(workers, 1))
+    done = object()
+    
+    def producer():
+        try:
+            while True:
+                try:
+                    page_iterator = pending.get_nowait()
+                except queue.Empty:
+                    break
+                for page in page_iterator:
+                    pages.put(page)
+        except Exception as e:
+            pages.put(e)
+        pages.put(done)
+    
+    for _ in range(workers):
+        threading.Thread(target=producer, daemon=True).start()
+    
+    while workers:
+        page = pages.get()
+        if page is done:
+            workers -= 1
+            continue
+        if isinstance(page, Exception):
+            raise page
+        yield page
+
+
+def dump_s3_inventory(bucket_name, output_file, profile_name=None, exclude_dirs=None, include_prefix=None):
     # Dump all S3 objects from bucket to CSV file with pagination
     try:
         
         if profile_name:
             session = boto3.Session(profile_name=profile_name)
-            s3_client = session.client('s3')
+            s3_client = session.client('s3', config=S3_CLIENT_CONFIG)
         else:
-            s3_client = boto3.client('s3')
+            s3_client = boto3.client('s3', config=S3_CLIENT_CONFIG)
         
         # Test bucket access
         s3_client.head_bucket(Bucket=bucket_name)
@@ -30,48 +108,57 @@ def dump_s3_inventory(bucket_name, output_file, profile_name=None, exclude_dir=N
             # Write CSV headers
             writer.writerow(['Last Modified', 'Full Path', 'Filename'])
             
-            # Initialize pagination variables
-            continuation_token = None
             object_count = 0
+            if isinstance(exclude_dirs, str):
+                exclude_dirs = [exclude_dirs]
+            exclude_prefixes = tuple(d.rstrip('/') + '/' for d in exclude_dirs or ())
+            base_prefix = include_prefix or ''
             
-            print(f"Starting inventory dump for bucket: {bucket_name}")
+            path_prefix = f"s3://{bucket_name}/"
             
-            while True:
-                # Prepare list_objects_v2 parameters
-                list_params = {
-                    'Bucket': bucket_name,
-                    'MaxKeys': 1000  # AWS recommended page size
-                }
-                
-                # Add continuation token if we have one
-                if continuation_token:
-                    list_params['ContinuationToken'] = continuation_token
+            # Write one page of objects to CSV, skipping excluded directories
+            def write_objects(objects):
+                nonlocal object_count
+                rows = []
+                for obj in objects:
+                    key = obj['Key']
+                    
+                    # Skip objects in excluded directory if specified
+                    if exclude_prefixes and key.startswith(exclude_prefixes):
+                        continue
+                    
+                    # isoformat() is cheaper than strftime(); drop the tzinfo so no
+                    # offset is appended and keep the same 'YYYY-MM-DD HH:MM:SS UTC' format
+                    last_modified = obj['LastModified'].replace(tzinfo=None).isoformat(' ', 'seconds') + ' UTC'
+                    
+                    rows.append((last_modified, path_prefix + key, key.rpartition('/')[2]))
                 
-                # List objects with pagination
-                response = s3_client.list_objects_v2(**list_params)
+                # Write the whole page to CSV at once
+                writer.writerows(rows)
+                object_count += len(rows)
                 
+                print(f"Processed {object_count} objects...")
+            
+            print(f"Starting inventory dump for bucket: {bucket_name}")
+            
+            # List objects with pagination, letting S3 filter on the include prefix
+            paginator = s3_client.get_paginator('list_objects_v2')
+            pagination_config = {'PageSize': 1000}  # AWS recommended page size
+            
+            # Excluded directories split the listing into key ranges that skip them
+            # with StartAfter; the ranges are listed in parallel. Keys are sorted the
+            # same way by S3 (UTF-8 bytes) and by Python (code points).
+            key_ranges = split_key_ranges(base_prefix, exclude_prefixes)
+            page_iterators = [
+                list_key_range(paginator, bucket_name, base_prefix, start_after, end_before, pagination_config)
+                for start_after, end_before in key_ranges
+            ]
+            max_workers = min(8, len(key_ranges))
+            
+            for page in prefetch_pages(page_iterators, max_workers):
                 # Check if we have any objects in this page
-                if 'Contents' in response:
-                    for obj in response['Contents']:
-                        # Skip objects in excluded directory if specified
-                        if exclude_dir and obj['Key'].startswith(exclude_dir.rstrip('/') + '/'):
-                            continue
-                        
-                        last_modified = obj['LastModified'].strftime('%Y-%m-%d %H:%M:%S UTC')
-                        full_path = f"s3://{bucket_name}/{obj['Key']}"
-                        filename = obj['Key'].split('/')[-1] if '/' in obj['Key'] else obj['Key']
-                        
-                        # Write to CSV
-                        writer.writerow([last_modified, full_path, filename])
-                        object_count += 1
-                    
-                    print(f"Processed {object_count} objects...")
-                
-                # Check if there are more objects to fetch
-                if response.get('IsTruncated', False):
-                    continuation_token = response['NextContinuationToken']
-                else:
-                    break
+                if 'Contents' in page:
+                    write_objects(page['Contents'])
         
         print(f"Inventory dump completed. Total objects: {object_count}")
         print(f"Output saved to: {output_file}")
@@ -100,7 +187,12 @@ def main():
     parser.add_argument('-o', '--output', 
                        help='Output CSV file name (default: {bucket_name}_inventory.csv)')
     parser.add_argument('-p', '--profile', help='AWS credential profile to use')
-    parser.add_argument('--exclude-dir', help='Directory path to exclude from inventory')
+    parser.add_argument('--exclude-dir', dest='exclude_dirs', action='append', default=[],
+                       help='Directory path to exclude from inventory (can be repeated)')
+    parser.add_argument('--exclude-dirs', dest='exclude_dirs', action='extend', nargs='+', metavar='DIR',
+                       help='One or more directory paths to exclude from inventory')
+    parser.add_argument('--include-prefix',
+                       help='Only inventory keys under this prefix (filtered server-side)')
     
     args = parser.parse_args()
     
@@ -108,7 +200,7 @@ def main():
     if not args.output:
         args.output = f"{args.bucket_name}_inventory.csv"
     
-    dump_s3_inventory(args.bucket_name, args.output, args.profile, args.exclude_dir)
+    dump_s3_inventory(args.bucket_name, args.output, args.profile, args.exclude_dirs, args.include_prefix)
 
 
 if __name__ == '__main__':
@@ -17,7 +17,7 @@
 #     -r, --recursive   Recursively rename all files in the given directory
 #
 # Dependencies:
-#     Uses only Python standard library modules (argparse, re, os, sys).
+#     Uses only Python standard library modules (argparse, re, os, sys, concurrent.futures).
 #     No additional modules need to be installed.
 #
 # Examples:
@@ -31,6 +31,30 @@ import argparse
 import re
 import os
 import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+# Runs of anything that is not a word character or period, plus underscores,
+# collapse to a single replacement character in one pass
+_RE_REPLACE_RUNS = re.compile(r'(?:[^\w.]|_)+')
+
+# ASCII fast path: a 256-entry byte table maps every byte other than ASCII letters,
+# digits and '.' to the replacement character in a single bytes.translate() call
+def _ascii_replacement_table(replacement_char):
+    return bytes(
+        i if i < 128 and (chr(i).isalnum() or chr(i) == '.') else ord(replacement_char)
+        for i in range(256)
+    )
+
+_ASCII_TABLES = {
+    '_': _ascii_replacement_table('_'),
+    '-': _ascii_replacement_table('-'),
+}
+
+# On POSIX, stat/rename can work relative to an open directory fd (statat/renameat),
+# so the kernel only resolves the leaf name instead of walking the full path each time
+_SUPPORTS_DIR_FD = (hasattr(os, 'O_DIRECTORY')
+                    and os.rename in os.supports_dir_fd
+                    and os.stat in os.supports_dir_fd)
 
 # Normalize filename by replacing special characters with underscores or dashes
 def normalize_filename(filename, use_dashes=False):
@@ -38,46 +62,111 @@ def normalize_filename(filename, use_dashes=False):
     
     base_name, extension = os.path.splitext(filename)
     
-    normalized_base = re.sub(r'[^\w.-]', replacement_char, base_name)
-    normalized_base = re.sub(r'[_-]+', replacement_char, normalized_base)
-    normalized_base = normalized_base.strip(replacement_char)
+    if base_name.isascii():
+        # Splitting on the replacement and dropping empty parts collapses runs
+        # and strips both ends at once
+        translated = base_name.encode('ascii').translate(_ASCII_TABLES[replacement_char]).decode('ascii')
+        normalized_base = replacement_char.join(filter(None, translated.split(replacement_char)))
+    else:
+        normalized_base = _RE_REPLACE_RUNS.sub(replacement_char, base_name)
+        normalized_base = normalized_base.strip(replacement_char)
     
     return normalized_base + extension
 
-# Rename a single file with normalized filename, returns success status and message
-def rename_single_file(filepath, use_dashes=False):
-    directory = os.path.dirname(filepath)
-    filename = os.path.basename(filepath)
+# Check whether a path exists, optionally relative to an open directory fd
+def path_exists(path, dir_fd=None):
+    try:
+        os.stat(path, dir_fd=dir_fd)
+    except (OSError, ValueError):
+        return False
+    return True
+
+# Rename a single file with normalized filename, returns success status and message.
+# When dir_fd is given (an open fd for directory), the rename is relative to that fd.
+def rename_single_file(directory, filename, use_dashes=False, dir_fd=None):
     normalized = normalize_filename(filename, use_dashes)
+    filepath = os.path.join(directory, filename)
     
     if normalized == filename:
         return False, f"File '{filepath}' is already normalized"
     
     new_filepath = os.path.join(directory, normalized)
     
-    if os.path.exists(new_filepath):
+    if dir_fd is None:
+        source, target = filepath, new_filepath
+    else:
+        source, target = filename, normalized
+    
+    # os.rename silently replaces an existing target on POSIX, so check first
+    if path_exists(target, dir_fd):
         return False, f"Target file '{new_filepath}' already exists"
     
     try:
-        os.rename(filepath, new_filepath)
+        os.rename(source, target, src_dir_fd=dir_fd, dst_dir_fd=dir_fd)
         return True, f"Renamed '{filepath}' -> '{new_filepath}'"
+    except FileExistsError:
+        return False, f"Target file '{new_filepath}' already exists"
     except OSError as e:
         return False, f"Error renaming '{filepath}': {e}"
 
-# Recursively process all files in directory and subdirectories
-def process_directory_recursive(directory, use_dashes=False):
+# Rename every file in one directory; files sharing a directory are handled
+# serially so two names normalizing to the same target cannot race each other.
+# The directory is opened once and every rename is issued relative to it.
+def rename_directory_files(root, filenames, use_dashes=False):
+    dir_fd = None
+    if _SUPPORTS_DIR_FD:
+        try:
+            dir_fd = os.open(root, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            pass  # Fall back to full paths
+    
+    try:
+        return [rename_single_file(root, filename, use_dashes, dir_fd) for filename in filenames]
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
+
+# Print the results of finished rename tasks and return (renamed, errors) counts
+def report_rename_results(futures):
     renamed_count = 0
     error_count = 0
-    
-    for root, dirs, files in os.walk(directory):
-        for filename in files:
-            filepath = os.path.join(root, filename)
-            success, message = rename_single_file(filepath, use_dashes)
+    for future in futures:
+        for success, message in future.result():
             print(message)
             if success:
                 renamed_count += 1
             else:
                 error_count += 1
+    return renamed_count, error_count
+
+# Recursively process all files in directory and subdirectories
+def process_directory_recursive(directory, use_dashes=False):
+    renamed_count = 0
+    error_count = 0
+    
+    # Renames are syscall-bound, so keep several directories in flight at once
+    max_workers = min(32, (os.cpu_count() or 1) * 4)
+    # Directories are submitted as the walk reaches them, with a bounded number in
+    # flight, so results print while walking and finished tasks are not kept around
+    max_pending = max_workers * 2
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        for root, dirs, files in os.walk(directory):
+            if not files:
+                continue
+            
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                renamed, errors = report_rename_results(done)
+                renamed_count += renamed
+                error_count += errors
+            
+            pending.add(executor.submit(rename_directory_files, root, files, use_dashes))
+        
+        renamed, errors = report_rename_results(as_completed(pending))
+        renamed_count += renamed
+        error_count += errors
     
     print(f"\nSummary: {renamed_count} files renamed, {error_count} errors/skipped")
 
@@ -109,7 +198,8 @@ def main():
         if os.path.isdir(args.path):
             print(f"Error: '{args.path}' is a directory. Use --recursive to process directories", file=sys.stderr)
             sys.exit(1)
-        success, message = rename_single_file(args.path, args.dashes)
+        directory, filename = os.path.split(args.path)
+        success, message = rename_single_file(directory, filename, args.dashes)
         print(message)
         if not success:
             sys.exit(1)
@@ -2,64 +2,144 @@
 
 # Script to generate random files with various sizes for testing purposes.
 
+import argparse
 import os
 import random
 import string
 import sys
 import time
-from optparse import OptionParser
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import accumulate
 
 
-# Generate random content of specified size in bytes
-def generate_random_content(size_bytes):
-    return ''.join(random.choices(string.ascii_letters + string.digits + string.punctuation + ' \n', k=size_bytes))
+# Characters used for random file content
+CONTENT_ALPHABET = (string.ascii_letters + string.digits + string.punctuation + ' \n').encode('ascii')
 
+# Maps every possible byte value onto the content alphabet
+CONTENT_TABLE = bytes(CONTENT_ALPHABET[i % len(CONTENT_ALPHABET)] for i in range(256))
 
-# Generate a random folder name.
-def generate_random_folder_name():
-    return ''.join(random.choices(string.ascii_lowercase + string.digits, k=random.randint(3, 8)))
+# Bytes from the last partial cycle of the alphabet would make its first characters
+# more likely, so they are rejected to keep every character equally likely
+CONTENT_REJECTED_BYTES = bytes(range(256 - 256 % len(CONTENT_ALPHABET), 256))
+
+# Flags for creating output files; O_BINARY only exists (and matters) on Windows
+FILE_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+
+# Files at least this large get their space reserved up front where supported
+PREALLOCATE_THRESHOLD = 1 << 20
+_HAS_POSIX_FALLOCATE = hasattr(os, 'posix_fallocate')
+
+# Minimum time in seconds between progress animation redraws
+PROGRESS_REDRAW_INTERVAL = 0.03
+_last_progress_draw = 0.0
+# Progress bar pieces built once and sliced on each redraw
+PROGRESS_BAR_LENGTH = 20
+_BAR_FULL = '█' * PROGRESS_BAR_LENGTH
+_BAR_EMPTY = '-' * PROGRESS_BAR_LENGTH
+_SPINNER = '|/-\\'
+
+# Upper bound on the combined size of files being generated at once. Each file
+# briefly needs about 2.5x its size in memory, so this caps peak usage no matter
+# how large --max-size is; a single file above the limit still runs on its own.
+MAX_IN_FLIGHT_BYTES = 64 * 1024 * 1024
+
+# Verbose output lines collected before each write to stdout
+VERBOSE_FLUSH_LINES = 1024
+
+
+# Generate random content of specified size in bytes. randbytes supplies the raw
+# random bytes: os.urandom by default, or a seeded Random's randbytes.
+def generate_random_content(size_bytes, randbytes=os.urandom):
+    # Rejection sampling done in C: translate() maps accepted bytes onto the alphabet
+    # and deletes rejected ones. Drawing 1.5x the remaining size almost always
+    # yields enough bytes in a single pass.
+    chunks = []
+    remaining = size_bytes
+    while remaining > 0:
+        chunk = randbytes(remaining + remaining // 2 + 64).translate(CONTENT_TABLE, CONTENT_REJECTED_BYTES)
+        chunk = chunk[:remaining]
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+# Generate several random folder names with bulk draws: one for all the
+# lengths and one for all the characters, which are then sliced apart.
+def generate_random_folder_names(rng, count):
+    lengths = rng.choices(range(3, 9), k=count)
+    chars = ''.join(rng.choices(string.ascii_lowercase + string.digits, k=sum(lengths)))
+    return [chars[end - length:end] for length, end in zip(lengths, accumulate(lengths))]
 
 
 # Create random subfolders with specified nesting depth.
-def create_random_subfolders(base_directory, num_folders, max_depth):
+def create_random_subfolders(rng, base_directory, num_folders, max_depth):
     folders = [base_directory]
+    # Nesting depth of each entry in folders, tracked as folders are created
+    depths = [0]
+    # Folders already created (or found); their parents are known to exist, so a
+    # single mkdir() of the leaf replaces makedirs() walking the whole path
+    known_folders = {base_directory}
+    folder_names = generate_random_folder_names(rng, num_folders)
+    randrange = rng.randrange
     
-    for _ in range(num_folders):
+    for folder_name in folder_names:
         # Choose a random parent folder from existing folders
-        parent_folder = random.choice(folders)
-        
-        # Calculate current depth
-        depth = parent_folder.replace(base_directory, '').count(os.sep)
+        parent_index = randrange(len(folders))
+        parent_folder = folders[parent_index]
+        depth = depths[parent_index]
         
         # Only create subfolder if we haven't reached max depth
         if depth < max_depth:
-            folder_name = generate_random_folder_name()
             new_folder = os.path.join(parent_folder, folder_name)
-            os.makedirs(new_folder, exist_ok=True)
+            if new_folder in known_folders:
+                continue
+            known_folders.add(new_folder)
+            
+            try:
+                os.mkdir(new_folder)
+            except FileExistsError:
+                # Left over from an earlier run; fine as long as it is a directory
+                if not os.path.isdir(new_folder):
+                    raise
+            
             folders.append(new_folder)
+            depths.append(depth + 1)
     
     return folders
 
 
-# Create a single random file with random size within specified range.
-def create_random_file(directory, file_index, min_size, max_size):
-    size = random.randint(min_size, max_size)
+# Create a single random file of the given size. With a seed, the content comes
+# from its own Random instance so it does not depend on thread scheduling.
+def create_random_file(directory, file_index, size, seed=None):
     filename = f"random_file_{file_index:04d}.txt"
     filepath = os.path.join(directory, filename)
     
-    content = generate_random_content(size)
+    if seed is None:
+        content = generate_random_content(size)
+    else:
+        content = generate_random_content(size, random.Random(seed).randbytes)
     
-    with open(filepath, 'w') as f:
-        f.write(content)
+    # The full content is already in memory, so it goes straight to the file
+    # descriptor without Python's io buffering layers
+    fd = os.open(filepath, FILE_OPEN_FLAGS, 0o644)
+    try:
+        if _HAS_POSIX_FALLOCATE and size >= PREALLOCATE_THRESHOLD:
+            try:
+                os.posix_fallocate(fd, 0, size)
+            except OSError:
+                # Not supported by every filesystem; the write allocates as it goes
+                pass
+        
+        # write() may be partial for large buffers, so keep writing the remainder
+        remaining = memoryview(content)
+        while remaining:
+            remaining = remaining[os.write(fd, remaining):]
+    finally:
+        os.close(fd)
     
     return filepath, size
 
 
-# Choose a random directory from the available directories.
-def choose_random_directory(directories):
-    return random.choice(directories)
-
-
 # Prompt user to confirm using current directory as target.
 def confirm_current_directory_usage():
     current_dir = os.getcwd()
@@ -77,74 +157,93 @@ def confirm_current_directory_usage():
 
 
 # Display a progress animation for non-verbose mode.
+# Redraws are limited to one per PROGRESS_REDRAW_INTERVAL seconds; the final frame is always drawn.
 def show_progress_animation(current, total, message="Processing"):
-    spinner_chars = ['|', '/', '-', '\\']
-    spinner = spinner_chars[current % len(spinner_chars)]
+    global _last_progress_draw
+    
+    now = time.monotonic()
+    if current != total and now - _last_progress_draw < PROGRESS_REDRAW_INTERVAL:
+        return
+    _last_progress_draw = now
+    
+    write = sys.stdout.write
+    spinner = _SPINNER[current % len(_SPINNER)]
     percentage = (current / total) * 100
     
     # Create progress bar
-    bar_length = 20
-    filled_length = int(bar_length * current // total)
-    bar = '█' * filled_length + '-' * (bar_length - filled_length)
+    filled_length = PROGRESS_BAR_LENGTH * current // total
+    bar = _BAR_FULL[:filled_length] + _BAR_EMPTY[filled_length:]
     
     # Clear line and show progress
-    sys.stdout.write(f'\r{message} {spinner} [{bar}] {percentage:.1f}% ({current}/{total})')
+    write(f'\r{message} {spinner} [{bar}] {percentage:.1f}% ({current}/{total})')
     sys.stdout.flush()
 
 
 # Main function to parse arguments and generate files.
 def main():
-    parser = OptionParser(usage="usage: %prog [options] [target_directory]")
-    
-    parser.add_option("-n", "--num-files", 
-                      dest="num_files", 
-                      type="int", 
-                      default=10,
-                      help="Number of files to generate (default: 10)")
-    
-    parser.add_option("--min-size", 
-                      dest="min_size", 
-                      type="int", 
-                      default=100,
-                      help="Minimum file size in bytes (default: 100)")
-    
-    parser.add_option("--max-size", 
-                      dest="max_size", 
-                      type="int", 
-                      default=10000,
-                      help="Maximum file size in bytes (default: 10000)")
-    
-    
-    parser.add_option("-v", "--verbose", 
-                      dest="verbose", 
-                      action="store_true", 
-                      default=False,
-                      help="Enable verbose output")
-    
-    parser.add_option("--num-folders", 
-                      dest="num_folders", 
-                      type="int", 
-                      default=0,
-                      help="Number of random subfolders to create (default: 0)")
-    
-    parser.add_option("--max-depth", 
-                      dest="max_depth", 
-                      type="int", 
-                      default=3,
-                      help="Maximum nesting depth for subfolders (default: 3)")
-    
-    parser.add_option("--distribute-files", 
-                      dest="distribute_files", 
-                      action="store_true", 
-                      default=False,
-                      help="Distribute files randomly across subfolders")
-
-    (options, args) = parser.parse_args()
+    parser = argparse.ArgumentParser(description='Generate files with random content for testing')
+    
+    parser.add_argument("-n", "--num-files", 
+                        dest="num_files", 
+                        type=int, 
+                        default=10,
+                        help="Number of files to generate (default: 10)")
+    
+    parser.add_argument("--min-size", 
+                        dest="min_size", 
+                        type=int, 
+                        default=100,
+                        help="Minimum file size in bytes (default: 100)")
+    
+    parser.add_argument("--max-size", 
+                        dest="max_size", 
+                        type=int, 
+                        default=10000,
+                        help="Maximum file size in bytes (default: 10000)")
+    
+    
+    parser.add_argument("-v", "--verbose", 
+                        dest="verbose", 
+                        action="store_true", 
+                        help="Enable verbose output")
+    
+    parser.add_argument("--num-folders", 
+                        dest="num_folders", 
+                        type=int, 
+                        default=0,
+                        help="Number of random subfolders to create (default: 0)")
+    
+    parser.add_argument("--max-depth", 
+                        dest="max_depth", 
+                        type=int, 
+                        default=3,
+                        help="Maximum nesting depth for subfolders (default: 3)")
+    
+    parser.add_argument("--distribute-files", 
+                        dest="distribute_files", 
+                        action="store_true", 
+                        help="Distribute files randomly across subfolders")
+    
+    parser.add_argument("--no-progress", 
+                        dest="no_progress", 
+                        action="store_true", 
+                        help="Do not show the progress animation")
+    
+    parser.add_argument("--seed", 
+                        dest="seed", 
+                        type=int, 
+                        help="Seed for reproducible folder names, file sizes and content")
+
+    parser.add_argument("target_directory", 
+                        nargs="?",
+                        help="Directory to create files in (default: current directory, after confirmation)")
+
+    options = parser.parse_args()
 
     # Determine target directory
-    if len(args) >= 1:
+    if options.target_directory is not None:
         # Use positional argument
-        target_directory = args[0]
+        target_directory = options.target_directory
     else:
         # No directory specified, use current directory with confirmation
         if not confirm_current_directory_usage():
@@ -173,59 +272,105 @@ def main():
 
     # Create output directory if it doesn't exist
     os.makedirs(options.directory, exist_ok=True)
+    
+    # One generator for the whole run; seeded from the OS when no seed is given
+    rng = random.Random(options.seed)
 
     print(f"Generating {options.num_files} files in '{options.directory}'")
     print(f"File size range: {options.min_size} - {options.max_size} bytes")
     
     # Create subfolders if requested
-    available_directories = [options.directory]
+    available_directories = (options.directory,)
     if options.num_folders > 0:
         print(f"Creating {options.num_folders} subfolders with max depth {options.max_depth}")
-        available_directories = create_random_subfolders(
+        available_directories = tuple(create_random_subfolders(
+            rng,
             options.directory, 
             options.num_folders, 
             options.max_depth
-        )
+        ))
         
         if options.verbose:
             for folder in available_directories[1:]:  # Skip base directory
                 print(f"Created folder: {folder}")
     
+    # The directory set is fixed from here on (hence the tuple), so its size is
+    # taken once
+    num_directories = len(available_directories)
+    
     total_size = 0
+    completed = 0
+    # Option values read on every iteration, looked up once here
+    num_files = options.num_files
+    verbose = options.verbose
+    # The carriage-return animation only makes sense on a terminal
+    show_progress = not verbose and not options.no_progress and sys.stdout.isatty()
     
-    for i in range(options.num_files):
-        # Show progress animation for non-verbose mode
-        if not options.verbose:
-            show_progress_animation(i + 1, options.num_files, "Creating files")
-        
-        # Choose directory for file placement
-        if options.distribute_files and len(available_directories) > 1:
-            target_directory = choose_random_directory(available_directories)
-        else:
-            target_directory = options.directory
-        
-        filepath, file_size = create_random_file(
-            target_directory, 
-            i + 1, 
-            options.min_size, 
-            options.max_size
-        )
-        total_size += file_size
-        
-        if options.verbose:
-            print(f"Created: {filepath} ({file_size} bytes)")
+    # File writes are I/O-bound and release the GIL, so several files are
+    # generated and written concurrently
+    max_workers = min(32, (os.cpu_count() or 4) * 2)
+    
+    # Draw every file size (and target directory) up front in bulk; choices() over a
+    # range indexes it directly, which is much cheaper than one randint() per file
+    sizes = rng.choices(range(options.min_size, options.max_size + 1), k=num_files)
+    if options.distribute_files and num_directories > 1:
+        target_directories = rng.choices(available_directories, k=num_files)
+    else:
+        target_directories = [options.directory] * num_files
+    # Content is only derived from the generator when a seed was asked for; otherwise
+    # os.urandom is used, which releases the GIL while the worker threads draw bytes
+    if options.seed is not None:
+        file_seeds = [rng.getrandbits(64) for _ in range(num_files)]
+    else:
+        file_seeds = [None] * num_files
+    
+    # Files are submitted through a window rather than all up front, bounded both in
+    # count (enough to keep every worker busy) and in total bytes
+    max_pending = max_workers * 2
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        pending_bytes = 0
+        next_index = 0
         
-        # Small delay for animation visibility
-        if not options.verbose:
-            time.sleep(0.05)
+        # Verbose lines are written in batches rather than one print() per file
+        log = []
+        log_append = log.append
+        try:
+            while next_index < num_files or pending:
+                while next_index < num_files and len(pending) < max_pending and (
+                        not pending or pending_bytes + sizes[next_index] <= MAX_IN_FLIGHT_BYTES):
+                    size = sizes[next_index]
+                    pending.add(executor.submit(create_random_file, target_directories[next_index],
+                                                next_index + 1, size, file_seeds[next_index]))
+                    pending_bytes += size
+                    next_index += 1
+                
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    filepath, file_size = future.result()
+                    pending_bytes -= file_size
+                    total_size += file_size
+                    completed += 1
+                    
+                    if verbose:
+                        log_append(f"Created: {filepath} ({file_size} bytes)\n")
+                        if len(log) >= VERBOSE_FLUSH_LINES:
+                            sys.stdout.write(''.join(log))
+                            log.clear()
+                    elif show_progress:
+                        # Show progress animation for non-verbose mode
+                        show_progress_animation(completed, num_files, "Creating files")
+        finally:
+            sys.stdout.write(''.join(log))
     
     # Clear progress line and show completion
-    if not options.verbose:
+    if show_progress:
         print()  # New line after progress bar
     
-    print(f"\nGenerated {options.num_files} files")
+    print(f"\nGenerated {num_files} files")
     if options.num_folders > 0:
-        print(f"Created {len(available_directories) - 1} subfolders")
+        print(f"Created {num_directories - 1} subfolders")
     print(f"Total size: {total_size} bytes ({total_size / 1024:.2f} KB)")
 
 